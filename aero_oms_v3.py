@@ -1,15 +1,12 @@
 import random, time, csv
-from datetime import datetime
 from collections import deque
-from rich.console import Console
-from rich.table import Table
-from rich.live import Live
-from rich import box
 import argparse
-from geopy.distance import great_circle
-from geopy import Point
 import math
 
+# rich is only needed for the live dashboard; it is imported lazily in the
+# display helpers so the model (Airport, Flight, ControllerAI) can be imported
+# and stepped without it.
+
 # --- PHASES & COLORS ---
 PHASE_COLORS = {
     "Ground_Taxi": "white",
@@ -44,16 +41,40 @@ AIRPORTS = [
     {"icao": "KTTD", "lat": 45.5494, "lon": -122.401}
 ]
 
-console = Console()
+_console = None
+
+def get_console():
+    # Create the rich Console on first use
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
 
 # --- GEODESY UTILS ---
+# Spherical-earth formulas, same model and radius as geopy's great_circle,
+# so positions match the previous geopy-based implementation.
+EARTH_RADIUS_NM = 6371.009 / 1.852
+
+def great_circle_nm(start_lat, start_lon, end_lat, end_lon):
+    # Great-circle distance in nautical miles
+    lat1, lon1 = math.radians(start_lat), math.radians(start_lon)
+    lat2, lon2 = math.radians(end_lat), math.radians(end_lon)
+    sin_lat1, cos_lat1 = math.sin(lat1), math.cos(lat1)
+    sin_lat2, cos_lat2 = math.sin(lat2), math.cos(lat2)
+    delta_lon = lon2 - lon1
+    cos_delta, sin_delta = math.cos(delta_lon), math.sin(delta_lon)
+    d = math.atan2(
+        math.sqrt((cos_lat2 * sin_delta) ** 2 + (cos_lat1 * sin_lat2 - sin_lat1 * cos_lat2 * cos_delta) ** 2),
+        sin_lat1 * sin_lat2 + cos_lat1 * cos_lat2 * cos_delta
+    )
+    return EARTH_RADIUS_NM * d
+
 def calculate_bearing(start_lat, start_lon, end_lat, end_lon):
     # Returns initial bearing in degrees from start to end
-    start = Point(start_lat, start_lon)
-    end = Point(end_lat, end_lon)
-    lat1 = math.radians(start.latitude)
-    lat2 = math.radians(end.latitude)
-    diff_long = math.radians(end.longitude - start.longitude)
+    lat1 = math.radians(start_lat)
+    lat2 = math.radians(end_lat)
+    diff_long = math.radians(end_lon - start_lon)
     x = math.sin(diff_long) * math.cos(lat2)
     y = math.cos(lat1) * math.sin(lat2) - (math.sin(lat1) * math.cos(lat2) * math.cos(diff_long))
     initial_bearing = math.atan2(x, y)
@@ -63,9 +84,16 @@ def calculate_bearing(start_lat, start_lon, end_lat, end_lon):
 
 def move_point(lat, lon, bearing, distance_nm):
     # Move a point by a bearing and distance (in nautical miles)
-    origin = Point(lat, lon)
-    destination = great_circle(nautical=distance_nm).destination(origin, bearing)
-    return destination.latitude, destination.longitude
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    bearing = math.radians(bearing)
+    d_div_r = distance_nm / EARTH_RADIUS_NM
+    lat2 = math.asin(math.sin(lat1) * math.cos(d_div_r) + math.cos(lat1) * math.sin(d_div_r) * math.cos(bearing))
+    lon2 = lon1 + math.atan2(
+        math.sin(bearing) * math.sin(d_div_r) * math.cos(lat1),
+        math.cos(d_div_r) - math.sin(lat1) * math.sin(lat2)
+    )
+    lon2 = (math.degrees(lon2) + 180) % 360 - 180
+    return math.degrees(lat2), lon2
 
 # --- CLASSES ---
 class Airport:
@@ -107,7 +135,7 @@ class Flight:
         self.lon = origin_lon
         self.dest_lat = dest_lat
         self.dest_lon = dest_lon
-        self.route_distance_nm = great_circle((origin_lat, origin_lon), (dest_lat, dest_lon)).nautical
+        self.route_distance_nm = great_circle_nm(origin_lat, origin_lon, dest_lat, dest_lon)
         self.distance_travelled_nm = 0
         self.bearing = calculate_bearing(origin_lat, origin_lon, dest_lat, dest_lon)
 
@@ -200,7 +228,31 @@ def generate_flights(n=10):
         flights.append(flight)
     return flights
 
+def flights_from_schedule(rows):
+    # Builds Flight objects from timetable rows (see schedule.py)
+    airports = {a["icao"]: a for a in AIRPORTS}
+    flights = []
+    for row in rows:
+        origin, dest = airports[row["origin"]], airports[row["destination"]]
+        flights.append(Flight(
+            row["flight_id"],
+            origin["icao"], dest["icao"],
+            departure_time=row["departure_tick"],
+            origin_lat=origin["lat"], origin_lon=origin["lon"],
+            dest_lat=dest["lat"], dest_lon=dest["lon"]
+        ))
+    return flights
+
+def check_schedule_airports(schedule):
+    from schedule import unique_values
+    known = {a["icao"] for a in AIRPORTS}
+    unknown = (unique_values(schedule, "origin") | unique_values(schedule, "destination")) - known
+    if unknown:
+        raise ValueError(f"Schedule uses airports not in AIRPORTS: {', '.join(sorted(unknown))}")
+
 def render_table(flights, tick):
+    from rich.table import Table
+    from rich import box
     table = Table(title=f"🛩️ Regional Air Traffic v3 — Tick {tick}", box=box.SQUARE)
     table.add_column("Flight", style="bold cyan")
     table.add_column("From ➡ To", style="magenta")
@@ -223,6 +275,31 @@ def render_table(flights, tick):
         )
     return table
 
+def render_metrics_table(metrics, title="📊 Live Metrics (ticks)", per_key=False):
+    # Percentiles from metrics.SimMetrics
+    from rich.table import Table
+    from rich import box
+    table = Table(title=title, box=box.SQUARE)
+    table.add_column("Metric", style="bold cyan")
+    table.add_column("Key", style="magenta")
+    for col in ["Count", "Mean", "p50", "p95", "p99", "Max"]:
+        table.add_column(col, justify="right")
+    for name, key, s in metrics.rows(per_key=per_key):
+        style = PHASE_COLORS.get(key, "white")
+        table.add_row(
+            name, f"[{style}]{key}[/{style}]",
+            str(s["count"]), f"{s['mean']:.1f}",
+            str(s["p50"]), str(s["p95"]), str(s["p99"]), str(s["max"])
+        )
+    return table
+
+def render_dashboard(flights, tick, metrics):
+    from rich.table import Table
+    grid = Table.grid()
+    grid.add_row(render_table(flights, tick))
+    grid.add_row(render_metrics_table(metrics))
+    return grid
+
 def log_to_csv(flights, tick, filename="sim_log.csv"):
     fieldnames = ["tick", "flight_id", "origin", "destination", "phase", "lat", "lon", "distance_travelled_nm", "route_distance_nm", "altitude", "delay"]
     write_header = tick == 0
@@ -245,23 +322,62 @@ def log_to_csv(flights, tick, filename="sim_log.csv"):
                 "delay": f.delay
             })
 
+def telemetry_snapshot(flights):
+    # Compact per-flight state for the telemetry stream (see telemetry.py)
+    return {
+        f.flight_id: {
+            "route": f"{f.origin}-{f.destination}",
+            "phase": f.phase,
+            "lat": round(f.lat, 4),
+            "lon": round(f.lon, 4),
+            "alt": f.altitude,
+            "dist": round(f.distance_travelled_nm, 1),
+            "delay": f.delay
+        }
+        for f in flights
+    }
+
 # --- MAIN LOOP ---
-def run_sim(duration_ticks, num_flights, tick_delay, tick_minutes=1):
+def run_sim(duration_ticks, num_flights, tick_delay, tick_minutes=1, telemetry=None, schedule=None, csv_log=True):
+    # With a compiled schedule (schedule.load_schedule), flights are added as
+    # their departure tick comes up instead of being generated at random.
+    from rich.live import Live
+    from metrics import SimMetrics
+    console = get_console()
+    metrics = SimMetrics()
     airports = {a["icao"]: Airport(a["icao"], a["lat"], a["lon"]) for a in AIRPORTS}
-    flights = generate_flights(num_flights)
+    if schedule is not None:
+        from schedule import ScheduleStream
+        check_schedule_airports(schedule)
+        departures = ScheduleStream(schedule)
+        flights = []
+    else:
+        departures = None
+        flights = generate_flights(num_flights)
     controller = ControllerAI(spacing_buffer=2)
-    with Live(render_table(flights, 0), refresh_per_second=2, console=console) as live:
+    with Live(render_dashboard(flights, 0, metrics), refresh_per_second=2, console=console) as live:
         for tick in range(duration_ticks):
+            if departures is not None:
+                flights.extend(flights_from_schedule(departures.due(tick)))
             for f in flights:
                 airport = airports[f.origin]
+                prev_phase = f.phase
                 f.step(tick, airport, controller, tick_minutes=tick_minutes)
+                if f.phase != prev_phase:
+                    metrics.observe_phase(f, prev_phase, tick)
                 if f.phase == "Takeoff" and airport.runway_queue and airport.runway_queue[0] == f:
                     airport.runway_queue.popleft()
-            live.update(render_table(flights, tick))
-            log_to_csv(flights, tick)
+            metrics.observe_queues(airports)
+            live.update(render_dashboard(flights, tick, metrics))
+            if telemetry is not None:
+                telemetry.publish(tick, telemetry_snapshot(flights))
+            if csv_log:
+                log_to_csv(flights, tick)
             time.sleep(tick_delay)
     for icao, ap in airports.items():
         console.print(f"[bold green]{icao} runway utilization: {ap.utilization} takeoffs")
+    console.print(render_metrics_table(metrics, title="📊 Final Report (ticks)", per_key=True))
+    return metrics
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Regional Air Traffic Simulator v3 (with geodesy)")
@@ -269,14 +385,32 @@ def parse_args():
     parser.add_argument("--flights", type=int, default=30, help="Number of concurrent flights")
     parser.add_argument("--realtime", type=float, default=0.05, help="Seconds per tick (simulation speed)")
     parser.add_argument("--tick_minutes", type=float, default=1, help="Simulated minutes per tick")
+    parser.add_argument("--telemetry_port", type=int, default=None, help="Stream per-tick snapshots on this local TCP port (0 = any free port)")
+    parser.add_argument("--telemetry_socket", type=str, default=None, help="Stream per-tick snapshots on this Unix socket path")
+    parser.add_argument("--schedule", type=str, default=None, help="Timetable CSV/JSON to replay instead of random flights (overrides --flights)")
+    parser.add_argument("--no_csv", action="store_true", help="Skip per-row sim_log.csv logging (metrics are still reported)")
     return parser.parse_args()
 
 if __name__ == "__main__":
     args = parse_args()
-    console.print("[bold blue]🛫 Starting Regional Air Traffic CLI Simulator v3 (geodesy)...")
-    run_sim(args.ticks, args.flights, args.realtime, tick_minutes=args.tick_minutes)
+    get_console().print("[bold blue]🛫 Starting Regional Air Traffic CLI Simulator v3 (geodesy)...")
+    schedule = None
+    if args.schedule:
+        from schedule import load_schedule
+        schedule = load_schedule(args.schedule)
+    telemetry = None
+    if args.telemetry_port is not None or args.telemetry_socket:
+        # Imported only when enabled: asyncio/threading add to CLI startup
+        from telemetry import start_telemetry, describe
+        telemetry = start_telemetry(args.telemetry_port, args.telemetry_socket)
+        get_console().print(f"[bold blue]📡 Telemetry streaming on {describe(telemetry)}")
+    try:
+        run_sim(args.ticks, args.flights, args.realtime, tick_minutes=args.tick_minutes, telemetry=telemetry, schedule=schedule, csv_log=not args.no_csv)
+    finally:
+        if telemetry is not None:
+            telemetry.stop()
 
 # ---
 # Requirements:
-#   pip install rich geopy
+#   pip install rich
 # --- 
\ No newline at end of file
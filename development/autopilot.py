@@ -1,11 +1,8 @@
 import os
-from openai import OpenAI
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# The OpenAI client automatically reads the OPENAI_API_KEY environment variable
-client = OpenAI()
+import json
+import hashlib
+import argparse
+from datetime import datetime
 
 # Get the absolute path to the directory where the script is located
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -14,30 +11,148 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 PROGRESS_LOG_PATH = os.path.join(script_dir, "progress.log")
 FEEDBACK_LOG_PATH = os.path.join(script_dir, "feedback.log")
 
-def read_log():
-    with open(PROGRESS_LOG_PATH, "r", encoding="utf-8") as f:
-        return f.read()
+# Review bookkeeping: how far progress.log has been reviewed, and cached
+# responses keyed by a hash of the request, so unchanged input costs nothing.
+STATE_PATH = os.path.join(script_dir, "autopilot_state.json")
+CACHE_PATH = os.path.join(script_dir, "autopilot_cache.json")
+
+MODEL = "gpt-4o"
+TOKEN_BUDGET = 3000  # Max (estimated) prompt tokens of log per request
+CHARS_PER_TOKEN = 4  # Rough estimate; avoids a tokenizer dependency
+
+SYSTEM_PROMPT = "You're an expert AI copilot reviewing a dev log."
+
+def make_client(base_url=None):
+    # The OpenAI client reads OPENAI_API_KEY from the environment (or .env).
+    # base_url points it at another OpenAI-compatible server, e.g. a local stub.
+    from openai import OpenAI
+    from dotenv import load_dotenv
+    load_dotenv()
+    return OpenAI(base_url=base_url) if base_url else OpenAI()
+
+def sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
 
-def write_feedback(feedback):
-    with open(FEEDBACK_LOG_PATH, "w", encoding="utf-8") as f:
+# Each report in progress.log starts with a "Version: ..." line (see
+# progresstemplate.md); reports are the unit sent for review
+REPORT_HEADER = b"Version:"
+
+def report_start(data, pos):
+    # Byte offset of the report containing pos (0 if there is no header before it)
+    i = data.rfind(b"\n" + REPORT_HEADER, 0, pos + 1)
+    return 0 if i < 0 else i + 1
+
+def read_new_log(state):
+    # Returns (text, start, end, end_hash): the unreviewed part of
+    # progress.log up to EOF, its byte offsets, and the hash of the whole log.
+    # If new lines extend a report that was already reviewed, the whole
+    # report is sent again so they are not reviewed without context. If the
+    # already-reviewed prefix changed (log edited or rotated), the whole log
+    # is reviewed again.
+    with open(PROGRESS_LOG_PATH, "rb") as f:
+        data = f.read()
+    start = state.get("offset", 0)
+    if start > len(data) or hashlib.sha256(data[:start]).hexdigest() != state.get("hash"):
+        start = 0
+    if start < len(data) and not data[start:].lstrip().startswith(REPORT_HEADER):
+        start = report_start(data, start)
+    return data[start:].decode("utf-8", errors="replace"), start, len(data), hashlib.sha256(data).hexdigest()
+
+def split_entries(text):
+    # Splits the log into reports, each starting at a "Version:" line; any
+    # text before the first header is kept as its own entry
+    entries, current = [], []
+    for line in text.splitlines(keepends=True):
+        if line.startswith(REPORT_HEADER.decode()) and current:
+            entries.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        entries.append("".join(current))
+    return [e.strip() for e in entries if e.strip()]
+
+def chunk_entries(entries, token_budget=TOKEN_BUDGET):
+    # Group whole entries into chunks under the token budget; an entry that is
+    # larger than the budget on its own is split into budget-sized pieces.
+    max_chars = token_budget * CHARS_PER_TOKEN
+    chunks, current, size = [], [], 0
+    for entry in entries:
+        pieces = [entry[i:i + max_chars] for i in range(0, len(entry), max_chars)]
+        for piece in pieces:
+            if current and size + len(piece) > max_chars:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece)
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+def generate_feedback(log, client, model=MODEL, cache=None):
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Progress log:\n\n{log}\n\nGive suggestions, or say '✓ All systems functional' if done."}
+    ]
+    key = sha256(json.dumps({"model": model, "messages": messages}, ensure_ascii=False, sort_keys=True))
+    if cache is not None and key in cache:
+        return cache[key]
+    response = client.chat.completions.create(model=model, messages=messages)
+    feedback = response.choices[0].message.content
+    if cache is not None:
+        cache[key] = feedback
+    return feedback
+
+def write_feedback(feedback, start, end):
+    # Append, so feedback on earlier entries is kept
+    with open(FEEDBACK_LOG_PATH, "a", encoding="utf-8") as f:
+        f.write(f"\n\n### [{datetime.now().isoformat(timespec='seconds')}] progress.log bytes {start}-{end}\n\n")
         f.write(feedback)
 
-def generate_feedback(log):
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": "You're an expert AI copilot reviewing a dev log."},
-            {"role": "user", "content": f"Progress log:\n\n{log}\n\nGive suggestions, or say '✓ All systems functional' if done."}
-        ]
-    )
-    return response.choices[0].message.content
+def review(client=None, model=MODEL, token_budget=TOKEN_BUDGET, full=False):
+    # Reviews unreviewed progress.log entries; returns the list of feedback
+    # strings (empty if there was nothing new).
+    state = {} if full else load_json(STATE_PATH, {})
+    cache = load_json(CACHE_PATH, {})
+    log, start, end, end_hash = read_new_log(state)
+    chunks = chunk_entries(split_entries(log), token_budget)
+    feedbacks = []
+    if chunks:
+        if client is None:
+            client = make_client()
+        for chunk in chunks:
+            feedbacks.append(generate_feedback(chunk, client, model=model, cache=cache))
+            # Save as we go so paid-for responses survive a later failure
+            save_json(CACHE_PATH, cache)
+        write_feedback("\n\n".join(feedbacks), start, end)
+    save_json(STATE_PATH, {"offset": end, "hash": end_hash})
+    return feedbacks
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Review new progress.log entries and append feedback")
+    parser.add_argument("--model", type=str, default=MODEL, help="Chat completion model")
+    parser.add_argument("--token_budget", type=int, default=TOKEN_BUDGET, help="Max estimated log tokens per request")
+    parser.add_argument("--base_url", type=str, default=None, help="OpenAI-compatible API base URL (e.g. a local stub server)")
+    parser.add_argument("--full", action="store_true", help="Review the whole log again, ignoring the saved offset")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    log = read_log()
-    if log.strip():
-        feedback = generate_feedback(log)
-        write_feedback(feedback)
-        print("✅ Feedback written to feedback.log\n")
-        print(feedback)
+    args = parse_args()
+    client = make_client(args.base_url) if args.base_url else None
+    feedbacks = review(client=client, model=args.model, token_budget=args.token_budget, full=args.full)
+    if feedbacks:
+        print("✅ Feedback appended to feedback.log\n")
+        print("\n\n".join(feedbacks))
     else:
-        print("⚠️ progress.log is empty.")
+        print("⚠️ No new entries in progress.log.")
@@ -0,0 +1,112 @@
+import os
+import sys
+import csv
+import subprocess
+import argparse
+from datetime import datetime
+
+# Get the absolute path to the directory where the script is located
+script_dir = os.path.dirname(os.path.abspath(__file__))
+repo_dir = os.path.dirname(script_dir)
+
+# Startup cost is tracked over time in this CSV
+STARTUP_LOG_PATH = os.path.join(script_dir, "startup_time.csv")
+
+# Modules whose import cost we track (the core model path should stay cheap)
+MODULES = ["aero_oms_v3", "nation_oms"]
+
+# Arguments for running each module as a CLI script with as little work as
+# possible, so everything imported under `if __name__ == "__main__":` counts too
+SCRIPT_ARGS = {
+    "aero_oms_v3": ["--ticks", "0", "--realtime", "0", "--no_csv"],
+    "nation_oms": ["--ticks", "0", "--realtime", "0"],
+}
+
+def run_importtime(args):
+    # Returns (indent, name, cumulative_us) for each `-X importtime` entry
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime"] + args,
+        cwd=repo_dir, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{result.stderr}")
+    entries = []
+    for line in result.stderr.splitlines():
+        # Format: "import time: self [us] | cumulative | imported package",
+        # with the package name indented by nesting level
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, name = line.replace("import time:", "", 1).split("|")
+        if not cumulative_us.strip().isdigit():
+            continue  # header row
+        entries.append((len(name) - len(name.lstrip()), name.strip(), int(cumulative_us)))
+    return entries
+
+def new_entries(entries, baseline):
+    # Drops the modules the interpreter loads at startup (the `-c pass`
+    # baseline), which always come first
+    skip = 0
+    while skip < min(len(entries), len(baseline)) and entries[skip][1] == baseline[skip][1]:
+        skip += 1
+    return entries[skip:]
+
+def measure(module, mode="import", runs=5):
+    # Returns the best-of-N import time (microseconds) and the number of
+    # modules pulled in beyond interpreter startup. mode "import" times
+    # `import module`; mode "script" times `python module.py SCRIPT_ARGS`.
+    if mode == "import":
+        args = ["-c", f"import {module}"]
+    else:
+        args = [f"{module}.py"] + SCRIPT_ARGS.get(module, [])
+    baseline = run_importtime(["-c", "pass"])
+    best_us = None
+    imported = 0
+    for _ in range(runs):
+        entries = new_entries(run_importtime(args), baseline)
+        if not entries:
+            total_us = 0
+        else:
+            # Sum the top-level entries; nested ones are already in their parent
+            top = min(indent for indent, _, _ in entries)
+            total_us = sum(us for indent, _, us in entries if indent == top)
+        if best_us is None or total_us < best_us:
+            best_us = total_us
+        imported = len(entries)
+    return best_us, imported
+
+def append_results(results):
+    write_header = not os.path.exists(STARTUP_LOG_PATH)
+    with open(STARTUP_LOG_PATH, "a", newline="", encoding="utf-8") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=["timestamp", "python", "module", "mode", "import_us", "modules_imported"])
+        if write_header:
+            writer.writeheader()
+        for row in results:
+            writer.writerow(row)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure and track simulator import (startup) time")
+    parser.add_argument("modules", nargs="*", default=MODULES, help="Modules to measure")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per module (best is kept)")
+    parser.add_argument("--no_log", action="store_true", help="Print only, do not append to startup_time.csv")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    python = ".".join(str(v) for v in sys.version_info[:3])
+    results = []
+    for module in args.modules:
+        for mode in ["import", "script"]:
+            import_us, imported = measure(module, mode=mode, runs=args.runs)
+            results.append({
+                "timestamp": timestamp,
+                "python": python,
+                "module": module,
+                "mode": mode,
+                "import_us": import_us,
+                "modules_imported": imported
+            })
+            print(f"{module} ({mode}): {import_us / 1000:.1f} ms ({imported} modules)")
+    if not args.no_log:
+        append_results(results)
+        print(f"✅ Results appended to {os.path.basename(STARTUP_LOG_PATH)}")
@@ -0,0 +1,144 @@
+# --- STREAMING METRICS ---
+# Fixed-memory, O(1)-per-event histograms for live and end-of-run percentiles
+# (departure delay, queue length, phase dwell, flight time) without per-row
+# logging.
+#
+# Histogram uses HDR-style log-linear buckets: values below 2**SUB_BITS get
+# their own bucket, larger values share SUB_BITS-bit buckets per power of two,
+# so the relative error is under 2**-(SUB_BITS-1) (~6% for SUB_BITS=5) and the
+# bucket count depends only on max_value.
+
+SUB_BITS = 5
+
+def bucket_index(value, sub_bits=SUB_BITS):
+    sub_count = 1 << sub_bits
+    if value < sub_count:
+        return value
+    shift = value.bit_length() - sub_bits
+    half = sub_count >> 1
+    return sub_count + (shift - 1) * half + ((value >> shift) - half)
+
+def bucket_range(index, sub_bits=SUB_BITS):
+    # Lowest and highest value that map to a bucket
+    sub_count = 1 << sub_bits
+    if index < sub_count:
+        return index, index
+    half = sub_count >> 1
+    shift = (index - sub_count) // half + 1
+    top = (index - sub_count) % half + half
+    return top << shift, ((top + 1) << shift) - 1
+
+class Histogram:
+    def __init__(self, max_value=1 << 20, sub_bits=SUB_BITS):
+        self.max_value = max_value
+        self.sub_bits = sub_bits
+        self.counts = [0] * (bucket_index(max_value, sub_bits) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        # Values are non-negative integers (ticks, queue lengths); larger
+        # values than max_value are clamped into the last bucket.
+        value = min(max(int(value), 0), self.max_value)
+        self.counts[bucket_index(value, self.sub_bits)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        # Returns the upper bound of the bucket holding the p-th percentile,
+        # capped at the largest value seen
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * p // 100))  # ceil without floats
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bucket_range(index, self.sub_bits)[1], self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": round(self.mean(), 2),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max or 0,
+        }
+
+class HistogramSet:
+    # Histograms keyed by label (airport, phase, route), plus an "ALL" total
+    def __init__(self, max_value=1 << 20):
+        self.max_value = max_value
+        self.by_key = {}
+
+    def record(self, key, value):
+        for k in (key, "ALL"):
+            if k not in self.by_key:
+                self.by_key[k] = Histogram(self.max_value)
+            self.by_key[k].record(value)
+
+    def get(self, key="ALL"):
+        return self.by_key.get(key) or Histogram(self.max_value)
+
+    def keys(self):
+        return sorted(k for k in self.by_key if k != "ALL")
+
+class SimMetrics:
+    # Online metrics for aero_oms_v3; all values are in ticks
+    def __init__(self):
+        self.departure_delay = HistogramSet()  # by origin airport
+        self.queue_length = HistogramSet()     # by airport, sampled every tick
+        self.phase_dwell = HistogramSet()      # by phase
+        self.flight_time = HistogramSet()      # by route, takeoff to landing
+        self.phase_start = {}  # flight_id -> tick the current phase started
+        self.takeoff_tick = {}  # flight_id -> takeoff tick, while airborne
+
+    def observe_phase(self, flight, prev_phase, tick):
+        # Call after flight.step() when flight.phase changed
+        fid = flight.flight_id
+        self.phase_dwell.record(prev_phase, tick - self.phase_start.get(fid, tick))
+        self.phase_start[fid] = tick
+        if flight.phase == "Takeoff":
+            self.departure_delay.record(flight.origin, flight.delay)
+            self.takeoff_tick[fid] = tick
+        elif flight.phase == "Landing":
+            self.phase_start.pop(fid, None)
+            start = self.takeoff_tick.pop(fid, None)
+            if start is not None:
+                self.flight_time.record(f"{flight.origin}-{flight.destination}", tick - start)
+
+    def observe_queues(self, airports):
+        for icao, airport in airports.items():
+            self.queue_length.record(icao, len(airport.runway_queue))
+
+    def rows(self, per_key=False):
+        # (metric, label, summary) rows for the dashboard and final report
+        # Phase dwell is always shown per phase; a total across phases is not useful
+        groups = [
+            ("Departure delay", self.departure_delay, per_key),
+            ("Queue length", self.queue_length, per_key),
+            ("Phase dwell", self.phase_dwell, None),
+            ("Flight time", self.flight_time, per_key),
+        ]
+        rows = []
+        for name, hists, expand in groups:
+            if expand is None:
+                keys = hists.keys()
+            elif expand:
+                keys = hists.keys() + ["ALL"]
+            else:
+                keys = ["ALL"]
+            for key in keys:
+                rows.append((name, key, hists.get(key).summary()))
+        return rows
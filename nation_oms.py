@@ -1,10 +1,9 @@
 import random
 import time
-from rich.console import Console
-from rich.table import Table
-from rich import box
-from rich.live import Live
-from rich.layout import Layout
+import argparse
+
+# rich is imported lazily by the dashboard helpers so the flight model can be
+# generated and stepped without it.
 
 # --- FAA REGIONS & FLIGHT TYPE DATA (from airtraffic.md) ---
 FAA_REGIONS = [
@@ -24,17 +23,39 @@ FAA_REGIONS = [
 FLIGHT_TYPE_EMOJIS = ["🛫", "🛩️", "🚕", "🪖", "📦"]
 FLIGHT_TYPE_NAMES = ["Commercial", "General Aviation", "Air Taxi", "Military", "Cargo"]
 
-console = Console()
+# Flight duration range by type (minutes, inclusive)
+FLIGHT_DURATIONS = {
+    "🛫": (60, 240),  # Commercial
+    "🛩️": (30, 120),  # GA
+    "🚕": (20, 90),   # Air Taxi
+    "🪖": (40, 180),  # Military
+    "📦": (60, 180),  # Cargo
+}
+
+# Flights start at a random minute within the first 6 hours (inclusive)
+START_WINDOW = 360
+
+_console = None
+
+def get_console():
+    # Create the rich Console on first use
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
 
 class Flight:
-    def __init__(self, region_code, flight_type, flight_id, duration):
+    __slots__ = ("region_code", "flight_type", "flight_id", "status", "progress", "duration", "start_time", "end_time")
+
+    def __init__(self, region_code, flight_type, flight_id, duration, start_time=None):
         self.region_code = region_code
         self.flight_type = flight_type  # Emoji
         self.flight_id = flight_id
         self.status = "Scheduled"  # Scheduled, Enroute, Landed
         self.progress = 0  # Minutes flown
         self.duration = duration  # Total minutes for flight
-        self.start_time = None  # Tick when flight starts
+        self.start_time = start_time  # Tick when flight starts
         self.end_time = None  # Tick when flight lands
 
     def step(self, tick):
@@ -46,41 +67,240 @@ class Flight:
                 self.status = "Landed"
                 self.end_time = tick
 
+# --- ACTIVE FLIGHT INDEX ---
+class DenseFlightSet:
+    # Dense list + position map: O(1) add/remove (swap-remove), O(k) sampling
+    def __init__(self):
+        self.items = []
+        self.pos = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, flight):
+        return flight in self.pos
+
+    def add(self, flight):
+        if flight in self.pos:
+            return
+        self.pos[flight] = len(self.items)
+        self.items.append(flight)
+
+    def remove(self, flight):
+        i = self.pos.pop(flight, None)
+        if i is None:
+            return
+        last = self.items.pop()
+        if last is not flight:
+            # Move the last element into the freed slot
+            self.items[i] = last
+            self.pos[last] = i
+
+    def sample(self, k, rng=random):
+        return rng.sample(self.items, min(k, len(self.items)))
+
+class ActiveFlightIndex:
+    # Enroute flights, indexed overall, by region, by type and by (region, type).
+    # Keys are (region_code, flight_type) with None meaning "any".
+    def __init__(self):
+        self.sets = {}
+
+    def _keys(self, flight):
+        return (
+            (None, None),
+            (flight.region_code, None),
+            (None, flight.flight_type),
+            (flight.region_code, flight.flight_type),
+        )
+
+    def __len__(self):
+        return len(self.get())
+
+    def get(self, region=None, flight_type=None):
+        return self.sets.get((region, flight_type)) or DenseFlightSet()
+
+    def add(self, flight):
+        for key in self._keys(flight):
+            self.sets.setdefault(key, DenseFlightSet()).add(flight)
+
+    def remove(self, flight):
+        for key in self._keys(flight):
+            if key in self.sets:
+                self.sets[key].remove(flight)
+
+    def update(self, flight, prev_status):
+        # Call after flight.step() when its status changed
+        if flight.status == "Enroute" and prev_status != "Enroute":
+            self.add(flight)
+        elif prev_status == "Enroute" and flight.status != "Enroute":
+            self.remove(flight)
+
+    def sample(self, k, region=None, flight_type=None, rng=random):
+        return self.get(region, flight_type).sample(k, rng)
+
+class FlightSample:
+    # Display sample that stays stable across frames; flights are only
+    # swapped out (and replaced at random) once they stop being Enroute.
+    def __init__(self, size=20, region=None, flight_type=None):
+        self.size = size
+        self.region = region
+        self.flight_type = flight_type
+        self.flights = []
+
+    def refresh(self, index, rng=random):
+        self.flights = [f for f in self.flights if f.status == "Enroute"]
+        need = self.size - len(self.flights)
+        if need > 0:
+            # Drawing need + len(current) guarantees enough flights not already shown
+            current = set(self.flights)
+            candidates = index.sample(need + len(current), self.region, self.flight_type, rng)
+            self.flights.extend([f for f in candidates if f not in current][:need])
+        return self.flights
+
 # Generate all flights for all regions
-def generate_flights(seed=42):
-    random.seed(seed)
-    flights = []
+class GeneratedDepartures:
+    # A generated schedule kept as arrays sorted by start time. Flight objects
+    # (and their IDs) are only created when due(tick) hands them out, so
+    # scaled-up scenarios don't build millions of objects up front.
+    def __init__(self, blocks, block_ids, serials, start_times, durations):
+        self.blocks = blocks  # (region_code, emoji, id_prefix, id_width) per block
+        self.block_ids = block_ids
+        self.serials = serials
+        self.start_times = start_times
+        self.durations = durations
+        self.cursor = 0
+        # Not-yet-departed flights per (region_code, emoji), for the Scheduled column
+        self.pending = {}
+        for (code, emoji, _, _), n in zip(blocks, self._block_counts(block_ids)):
+            self.pending[(code, emoji)] = n
+
+    def _block_counts(self, block_ids):
+        import numpy as np
+        return np.bincount(block_ids, minlength=len(self.blocks)).tolist()
+
+    def __len__(self):
+        return len(self.start_times)
+
+    def remaining(self):
+        return len(self.start_times) - self.cursor
+
+    def due(self, tick):
+        # Flights starting at or before tick that have not been returned yet
+        import numpy as np
+        end = int(np.searchsorted(self.start_times, tick, side="right"))
+        if end <= self.cursor:
+            return []
+        window = slice(self.cursor, end)
+        self.cursor = end
+        blocks = self.blocks
+        flights = []
+        for block_id, serial, start_time, duration in zip(
+            self.block_ids[window].tolist(), self.serials[window].tolist(),
+            self.start_times[window].tolist(), self.durations[window].tolist()
+        ):
+            code, emoji, prefix, width = blocks[block_id]
+            flights.append(Flight(code, emoji, f"{prefix}{serial:0{width}d}", duration, start_time))
+        for (code, emoji, _, _), n in zip(blocks, self._block_counts(self.block_ids[window])):
+            self.pending[(code, emoji)] -= n
+        return flights
+
+def generate_departures(seed=42, scale=1):
+    # Draws start times and durations for each (region, type) block in one
+    # NumPy Generator call per array, with duration bounds from
+    # FLIGHT_DURATIONS; output is reproducible for a given seed. scale
+    # multiplies every FAA_REGIONS count (e.g. 10 or 100 for large scenarios).
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    blocks, counts = [], []
     for region in FAA_REGIONS:
+        code = region["code"]
         for emoji in FLIGHT_TYPE_EMOJIS:
-            n = region["flights"].get(emoji, 0)
-            for i in range(n):
-                flight_id = f"{region['code']}-{emoji}-{i+1:04d}"
-                # Randomly assign a start time within the first 6 hours (360 min)
-                start_time = random.randint(0, 360)
-                # Assign a duration based on type (in minutes)
-                if emoji == "🛫":
-                    duration = random.randint(60, 240)  # Commercial
-                elif emoji == "🛩️":
-                    duration = random.randint(30, 120)  # GA
-                elif emoji == "🚕":
-                    duration = random.randint(20, 90)   # Air Taxi
-                elif emoji == "🪖":
-                    duration = random.randint(40, 180)  # Military
-                elif emoji == "📦":
-                    duration = random.randint(60, 180)  # Cargo
-                f = Flight(region['code'], emoji, flight_id, duration)
-                f.start_time = start_time
-                flights.append(f)
+            n = int(round(region["flights"].get(emoji, 0) * scale))
+            if n > 0:
+                blocks.append((code, emoji, f"{code}-{emoji}-", max(4, len(str(n)))))
+                counts.append(n)
+    total = sum(counts)
+    block_ids = np.empty(total, dtype=np.int16)
+    serials = np.empty(total, dtype=np.int32)
+    # START_WINDOW fits in int16, which numpy sorts with a fast stable radix sort
+    start_times = np.empty(total, dtype=np.int16)
+    durations = np.empty(total, dtype=np.int32)
+    offset = 0
+    for block_id, ((_, emoji, _, _), n) in enumerate(zip(blocks, counts)):
+        lo, hi = FLIGHT_DURATIONS[emoji]
+        block = slice(offset, offset + n)
+        block_ids[block] = block_id
+        serials[block] = np.arange(1, n + 1, dtype=np.int32)
+        start_times[block] = rng.integers(0, START_WINDOW, size=n, endpoint=True, dtype=np.int16)
+        durations[block] = rng.integers(lo, hi, size=n, endpoint=True, dtype=np.int32)
+        offset += n
+    order = np.argsort(start_times, kind="stable")
+    return GeneratedDepartures(blocks, block_ids[order], serials[order], start_times[order], durations[order])
+
+def flights_from_schedule(rows, rng=random):
+    # Builds Flight objects from timetable rows (see schedule.py). origin is
+    # the FAA region code and type is a flight type emoji or name; rows
+    # without a duration get one drawn from FLIGHT_DURATIONS.
+    type_emojis = dict(zip(FLIGHT_TYPE_NAMES, FLIGHT_TYPE_EMOJIS))
+    flights = []
+    for row in rows:
+        emoji = type_emojis.get(row["type"], row["type"])
+        duration = row["duration"]
+        if duration is None:
+            duration = rng.randint(*FLIGHT_DURATIONS[emoji])
+        flights.append(Flight(row["origin"], emoji, row["flight_id"], duration, row["departure_tick"]))
     return flights
 
-def summarize_by_region(flights):
-    # Count flights by region, type, and status
+class ScheduledDepartures:
+    # Timetable replay (see schedule.py) with the same due()/pending interface
+    # as GeneratedDepartures
+    def __init__(self, schedule, rng=random):
+        import numpy as np
+        from schedule import ScheduleStream
+        self.stream = ScheduleStream(schedule)
+        self.rng = rng
+        type_emojis = dict(zip(FLIGHT_TYPE_NAMES, FLIGHT_TYPE_EMOJIS))
+        self.pending = {}
+        keys, counts = np.unique(schedule[["origin", "type"]], return_counts=True)
+        for (origin, flight_type), n in zip(keys.tolist(), counts.tolist()):
+            flight_type = flight_type.decode("utf-8")
+            key = (origin.decode("utf-8"), type_emojis.get(flight_type, flight_type))
+            self.pending[key] = self.pending.get(key, 0) + n
+
+    def __len__(self):
+        return len(self.stream)
+
+    def remaining(self):
+        return self.stream.remaining()
+
+    def due(self, tick):
+        flights = flights_from_schedule(self.stream.due(tick), self.rng)
+        for f in flights:
+            self.pending[(f.region_code, f.flight_type)] -= 1
+        return flights
+
+def check_schedule(schedule):
+    from schedule import unique_values
+    unknown_regions = unique_values(schedule, "origin") - {r["code"] for r in FAA_REGIONS}
+    if unknown_regions:
+        raise ValueError(f"Schedule uses unknown FAA region codes: {', '.join(sorted(unknown_regions))}")
+    unknown_types = unique_values(schedule, "type") - set(FLIGHT_TYPE_EMOJIS) - set(FLIGHT_TYPE_NAMES)
+    if unknown_types:
+        raise ValueError(f"Schedule uses unknown flight types: {', '.join(sorted(unknown_types))}")
+
+def summarize_by_region(flights, pending=None):
+    # Count flights by region, type, and status; pending adds flights that
+    # have not been created yet ({(region_code, emoji): n}) as Scheduled
     summary = {region["code"]: {emoji: {"Enroute": 0, "Landed": 0, "Scheduled": 0} for emoji in FLIGHT_TYPE_EMOJIS} for region in FAA_REGIONS}
+    for (code, emoji), n in (pending or {}).items():
+        summary[code][emoji]["Scheduled"] += n
     for f in flights:
         summary[f.region_code][f.flight_type][f.status] += 1
     return summary
 
 def make_summary_table(summary):
+    from rich.table import Table
+    from rich import box
     table = Table(title="🗺️ U.S. National Airspace Simulation — FAA Regions", box=box.SQUARE)
     table.add_column("Region", style="bold cyan")
     for emoji, name in zip(FLIGHT_TYPE_EMOJIS, FLIGHT_TYPE_NAMES):
@@ -105,10 +325,10 @@ def make_summary_table(summary):
         table.add_row(*row)
     return table
 
-def make_flight_sample_table(flights, tick, sample_size=20):
-    # Show a sample of active flights
-    active = [f for f in flights if f.status == "Enroute"]
-    sample = random.sample(active, min(sample_size, len(active))) if active else []
+def make_flight_sample_table(sample, tick):
+    from rich.table import Table
+    from rich import box
+    # Show a sample of active flights (see FlightSample)
     table = Table(title=f"✈️ Sample of Active Flights (Tick {tick})", box=box.SQUARE)
     table.add_column("Flight ID", style="bold cyan")
     table.add_column("Region", style="magenta")
@@ -121,23 +341,77 @@ def make_flight_sample_table(flights, tick, sample_size=20):
         table.add_row(f.flight_id, f.region_code, f.flight_type, f"{f.progress}/{f.duration} min ({pct}%)", str(f.duration), f.status)
     return table
 
-def run_sim(ticks=10000, realtime=1.0):
-    flights = generate_flights()
-    with Live(console=console, refresh_per_second=2) as live:
+def telemetry_snapshot(summary, sample):
+    # Compact state for the telemetry stream (see telemetry.py): per-region
+    # [enroute, landed, scheduled] counts by type, plus the displayed sample.
+    state = {
+        f"region:{code}": {emoji: [c["Enroute"], c["Landed"], c["Scheduled"]] for emoji, c in by_type.items()}
+        for code, by_type in summary.items()
+    }
+    for f in sample:
+        state[f"flight:{f.flight_id}"] = {"progress": f.progress, "duration": f.duration}
+    return state
+
+def run_sim(ticks=10000, realtime=1.0, seed=42, scale=1, telemetry=None, schedule=None):
+    # With a compiled schedule (schedule.load_schedule), flights are added as
+    # their departure tick comes up instead of being generated at random.
+    from rich.live import Live
+    from rich.table import Table
+    if schedule is not None:
+        check_schedule(schedule)
+        departures = ScheduledDepartures(schedule, random.Random(seed))
+    else:
+        departures = generate_departures(seed=seed, scale=scale)
+    flights = []
+    active = ActiveFlightIndex()
+    sample = FlightSample(size=20)
+    with Live(console=get_console(), refresh_per_second=2) as live:
         for tick in range(ticks):
+            flights.extend(departures.due(tick))
             for f in flights:
+                prev_status = f.status
                 f.step(tick)
-            summary = summarize_by_region(flights)
+                if f.status != prev_status:
+                    active.update(f, prev_status)
+            summary = summarize_by_region(flights, departures.pending)
             summary_table = make_summary_table(summary)
-            sample_table = make_flight_sample_table(flights, tick)
+            sample_table = make_flight_sample_table(sample.refresh(active), tick)
+            if telemetry is not None:
+                telemetry.publish(tick, telemetry_snapshot(summary, sample.flights))
             grid = Table.grid()
             grid.add_row(summary_table)
             grid.add_row(sample_table)
             live.update(grid)
             time.sleep(realtime)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="U.S. National Airspace Simulator (FAA regions)")
+    parser.add_argument("--ticks", type=int, default=10000, help="Number of simulation steps (minutes)")
+    parser.add_argument("--realtime", type=float, default=1.0, help="Seconds per tick (simulation speed)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for flight generation")
+    parser.add_argument("--scale", type=float, default=1, help="Multiplier on FAA_REGIONS flight counts")
+    parser.add_argument("--telemetry_port", type=int, default=None, help="Stream per-tick snapshots on this local TCP port (0 = any free port)")
+    parser.add_argument("--telemetry_socket", type=str, default=None, help="Stream per-tick snapshots on this Unix socket path")
+    parser.add_argument("--schedule", type=str, default=None, help="Timetable CSV/JSON to replay instead of generated flights (overrides --seed/--scale)")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    run_sim(ticks=10000, realtime=1.0)
+    args = parse_args()
+    schedule = None
+    if args.schedule:
+        from schedule import load_schedule
+        schedule = load_schedule(args.schedule)
+    telemetry = None
+    if args.telemetry_port is not None or args.telemetry_socket:
+        # Imported only when enabled: asyncio/threading add to CLI startup
+        from telemetry import start_telemetry, describe
+        telemetry = start_telemetry(args.telemetry_port, args.telemetry_socket)
+        get_console().print(f"[bold blue]📡 Telemetry streaming on {describe(telemetry)}")
+    try:
+        run_sim(ticks=args.ticks, realtime=args.realtime, seed=args.seed, scale=args.scale, telemetry=telemetry, schedule=schedule)
+    finally:
+        if telemetry is not None:
+            telemetry.stop()
 
 # ---
 # This script now simulates live, minute-by-minute flight progress for the entire U.S. airspace.
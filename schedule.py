@@ -0,0 +1,154 @@
+import os
+import csv
+import json
+
+# --- COMPILED SCHEDULES ---
+# Replays a real or shared timetable instead of a randomly generated one.
+#
+# A timetable is a CSV (with a header row) or JSON file (a list of objects,
+# or {"flights": [...]}) with the fields:
+#   flight_id, origin, destination, departure_tick, type
+# and optionally duration (ticks; used by nation_oms). Rows are decoded into
+# dicts with the same keys (duration is None when not given).
+#
+# The first load compiles the timetable into a NumPy structured array sorted
+# by departure tick and saves it next to the source as <timetable>.sched.npy.
+# Later loads memory-map that file, so large schedules load in milliseconds.
+# The source's size and mtime are stored in <timetable>.sched.json; it is
+# recompiled whenever either differs (edited, replaced, or copied with an
+# older mtime).
+
+SCHEDULE_FIELDS = ["flight_id", "origin", "destination", "departure_tick", "type"]
+# Smallest allowed value of each integer field
+INT_FIELDS = {"departure_tick": 0, "duration": 1}
+COMPILED_SUFFIX = ".sched.npy"
+STAMP_SUFFIX = ".sched.json"
+
+def parse_int(value):
+    # Whole numbers only: ints, integral floats (JSON 2.0) or integer strings;
+    # returns None for anything else (e.g. 1.5, "1.5", true)
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        return None
+
+def read_timetable(path):
+    # Returns the timetable rows as a list of dicts, with departure_tick and
+    # duration (when given) converted to int and range-checked
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f)
+        if isinstance(rows, dict):
+            rows = rows.get("flights", [])
+    else:
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+    for i, row in enumerate(rows):
+        missing = [k for k in SCHEDULE_FIELDS if row.get(k) in (None, "")]
+        if missing:
+            raise ValueError(f"{path}: row {i + 1} is missing {', '.join(missing)}")
+        for k, minimum in INT_FIELDS.items():
+            if row.get(k) in (None, ""):
+                continue
+            value = parse_int(row[k])
+            if value is None:
+                raise ValueError(f"{path}: row {i + 1} has non-integer {k} {row[k]!r}")
+            if value < minimum:
+                raise ValueError(f"{path}: row {i + 1} has {k} {value}, must be at least {minimum}")
+            row[k] = value
+    return rows
+
+def compile_schedule(rows, out_path=None):
+    # Builds the departure-sorted structured array (and saves it if out_path)
+    import numpy as np
+    def width(field):
+        return max([len(str(r[field]).encode("utf-8")) for r in rows] + [1])
+    dtype = [
+        ("departure_tick", "<i8"),
+        ("duration", "<i4"),  # -1 when not given
+        ("flight_id", f"S{width('flight_id')}"),
+        ("origin", f"S{width('origin')}"),
+        ("destination", f"S{width('destination')}"),
+        ("type", f"S{width('type')}"),
+    ]
+    schedule = np.array([
+        (
+            int(r["departure_tick"]),
+            int(r["duration"]) if r.get("duration") not in (None, "") else -1,
+            str(r["flight_id"]).encode("utf-8"),
+            str(r["origin"]).encode("utf-8"),
+            str(r["destination"]).encode("utf-8"),
+            str(r["type"]).encode("utf-8"),
+        )
+        for r in rows
+    ], dtype=dtype)
+    schedule = schedule[np.argsort(schedule["departure_tick"], kind="stable")]
+    if out_path:
+        tmp = out_path + ".tmp.npy"
+        np.save(tmp, schedule)
+        os.replace(tmp, out_path)
+    return schedule
+
+def load_schedule(path):
+    # Memory-maps the compiled schedule, compiling the timetable first if needed
+    import numpy as np
+    compiled, stamp_path = path + COMPILED_SUFFIX, path + STAMP_SUFFIX
+    st = os.stat(path)
+    stamp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    saved = None
+    if os.path.exists(compiled) and os.path.exists(stamp_path):
+        with open(stamp_path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+    if saved != stamp:
+        compile_schedule(read_timetable(path), compiled)
+        with open(stamp_path, "w", encoding="utf-8") as f:
+            json.dump(stamp, f)
+    return np.load(compiled, mmap_mode="r")
+
+def unique_values(schedule, field):
+    # Distinct decoded values of a text field, e.g. to validate airport codes
+    import numpy as np
+    return {v.decode("utf-8") for v in np.unique(schedule[field]).tolist()}
+
+def decode_rows(block):
+    # Converts a slice of the schedule into dicts of plain Python values
+    return [
+        {
+            "flight_id": flight_id.decode("utf-8"),
+            "origin": origin.decode("utf-8"),
+            "destination": destination.decode("utf-8"),
+            "departure_tick": departure_tick,
+            "type": flight_type.decode("utf-8"),
+            "duration": duration if duration >= 0 else None,
+        }
+        for departure_tick, duration, flight_id, origin, destination, flight_type in block.tolist()
+    ]
+
+class ScheduleStream:
+    # Streams departures in time order; due(tick) returns the rows departing
+    # at or before tick that have not been returned yet.
+    def __init__(self, schedule):
+        self.schedule = schedule
+        self.departures = schedule["departure_tick"]
+        self.cursor = 0
+
+    def __len__(self):
+        return len(self.schedule)
+
+    def remaining(self):
+        return len(self.schedule) - self.cursor
+
+    def due(self, tick):
+        import numpy as np
+        end = int(np.searchsorted(self.departures, tick, side="right"))
+        if end <= self.cursor:
+            return []
+        rows = decode_rows(self.schedule[self.cursor:end])
+        self.cursor = end
+        return rows
@@ -0,0 +1,160 @@
+import json
+import asyncio
+import threading
+
+# --- LOCAL TELEMETRY STREAM ---
+# Streams per-tick simulation snapshots to local subscribers (dashboards,
+# loggers) as newline-delimited JSON over TCP or a Unix socket.
+#
+# A snapshot is a dict of {key: row}, where each row is a small JSON-able
+# value (e.g. one flight or one region summary). Messages:
+#   {"type": "full",  "tick": t, "state": {key: row, ...}}
+#   {"type": "delta", "tick": t, "changed": {key: row, ...}, "removed": [key, ...]}
+# A client gets a full frame on connect and deltas afterwards. If a client
+# is too slow and its queue fills up, frames are dropped and it is sent a
+# fresh full frame once it catches up, so the simulation never waits.
+
+class TelemetryServer:
+    def __init__(self, host="127.0.0.1", port=8765, path=None, max_queue=8):
+        self.host = host
+        self.port = port
+        self.path = path  # Unix socket path; overrides host/port when set
+        self.max_queue = max_queue
+        self.state = {}
+        self.tick = None
+        self.clients = {}  # writer -> [queue, needs_full, task]
+        self.dropped = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._error = None
+
+    # --- called from the simulation thread ---
+    def start(self):
+        # Run the asyncio server on a background thread
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), daemon=True)
+        self._thread.start()
+        ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def publish(self, tick, state):
+        # Hand the snapshot to the server loop; never blocks the caller
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._broadcast, tick, state)
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+    # --- server loop ---
+    def _run(self, ready):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        if self.path:
+            start = asyncio.start_unix_server(self._handle_client, path=self.path)
+        else:
+            start = asyncio.start_server(self._handle_client, self.host, self.port)
+        try:
+            self._server = self._loop.run_until_complete(start)
+        except OSError as e:
+            # e.g. port already in use; re-raised from start()
+            self._error = e
+            self._loop.close()
+            self._loop = None
+            ready.set()
+            return
+        if not self.path:
+            self.port = self._server.sockets[0].getsockname()[1]
+        ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    async def _shutdown(self):
+        self._server.close()
+        await self._server.wait_closed()
+        tasks = [client[2] for client in self.clients.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _full_frame(self):
+        return _encode({"type": "full", "tick": self.tick, "state": self.state})
+
+    def _broadcast(self, tick, state):
+        changed = {k: v for k, v in state.items() if self.state.get(k) != v}
+        removed = [k for k in self.state if k not in state]
+        self.state = state
+        self.tick = tick
+        if not self.clients:
+            return
+        delta = _encode({"type": "delta", "tick": tick, "changed": changed, "removed": removed})
+        full = None
+        for client in self.clients.values():
+            queue, needs_full = client[0], client[1]
+            if queue.full():
+                # Slow client: drop this frame and resync with a full frame later
+                client[1] = True
+                self.dropped += 1
+                continue
+            if needs_full:
+                if full is None:
+                    full = self._full_frame()
+                queue.put_nowait(full)
+                client[1] = False
+            else:
+                queue.put_nowait(delta)
+
+    async def _handle_client(self, reader, writer):
+        queue = asyncio.Queue(maxsize=self.max_queue)
+        queue.put_nowait(self._full_frame())
+        self.clients[writer] = [queue, False, asyncio.current_task()]
+        sender = asyncio.ensure_future(_send_frames(queue, writer))
+        watcher = asyncio.ensure_future(_wait_for_eof(reader))
+        try:
+            # Ends when the client disconnects or a write fails
+            await asyncio.wait([sender, watcher], return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.clients.pop(writer, None)
+            sender.cancel()
+            watcher.cancel()
+            await asyncio.gather(sender, watcher, return_exceptions=True)
+            writer.close()
+
+async def _send_frames(queue, writer):
+    try:
+        while True:
+            frame = await queue.get()
+            writer.write(frame)
+            await writer.drain()
+    except ConnectionError:
+        pass
+
+async def _wait_for_eof(reader):
+    # Subscribers don't send anything; reading is only how a disconnect is noticed
+    try:
+        while await reader.read(4096):
+            pass
+    except ConnectionError:
+        pass
+
+def _encode(message):
+    return (json.dumps(message, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+def start_telemetry(port=None, path=None):
+    # Convenience for the simulators' CLI flags; returns None when disabled.
+    # port=0 picks a free port (see server.port).
+    if port is None and not path:
+        return None
+    return TelemetryServer(port=port or 0, path=path).start()
+
+def describe(server):
+    return f"unix:{server.path}" if server.path else f"tcp://{server.host}:{server.port}"